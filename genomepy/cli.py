@@ -77,6 +77,13 @@ general_install_options = {
         "help": "overwrite existing files",
         "flag_value": True,
     },
+    "threads": {
+        "short": "t",
+        "long": "threads",
+        "help": "number of threads used by bgzip (default: 1)",
+        "type": int,
+        "default": 1,
+    },
 }
 
 
@@ -134,6 +141,7 @@ def install(
     bgzip,
     annotation,
     force,
+    threads,
     **kwargs
 ):
     """Install genome NAME from provider PROVIDER in directory GENOME_DIR."""
@@ -148,6 +156,7 @@ def install(
         bgzip=bgzip,
         annotation=annotation,
         force=force,
+        threads=threads,
         **kwargs
     )
 
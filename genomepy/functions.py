@@ -155,6 +155,7 @@ def install_genome(
     bgzip=None,
     annotation=False,
     force=False,
+    threads=1,
     **kwargs
 ):
     """
@@ -193,6 +194,9 @@ def install_genome(
     force : bool , optional
         Set to True to overwrite existing files.
 
+    threads : int , optional
+        Number of threads used to bgzip the genome. Default is 1.
+
     kwargs : dict, optional
         Provider specific options.
         Ensembl:
@@ -227,6 +231,7 @@ def install_genome(
             invert_match=invert_match,
             localname=localname,
             bgzip=bgzip,
+            threads=threads,
             **kwargs
         )
 
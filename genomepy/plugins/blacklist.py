@@ -1,5 +1,4 @@
 import os.path
-import re
 import sys
 from urllib.request import urlopen
 from genomepy.plugin import Plugin
@@ -41,7 +40,10 @@ class BlacklistPlugin(Plugin):
                 )
 
     def get_properties(self, genome):
-        props = {
-            "blacklist": re.sub(".fa(.gz)?$", ".blacklist.bed.gz", genome.filename)
-        }
+        fname = genome.filename
+        if fname.endswith(".gz"):
+            fname = fname[:-3]
+        if fname.endswith(".fa"):
+            fname = fname[:-3]
+        props = {"blacklist": fname + ".blacklist.bed.gz"}
         return props
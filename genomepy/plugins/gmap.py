@@ -1,5 +1,4 @@
 import os.path
-import re
 import subprocess as sp
 from shutil import move, rmtree
 from tempfile import TemporaryDirectory
@@ -26,7 +25,7 @@ class GmapPlugin(Plugin):
                 ret = sp.check_call(["gunzip", fname])
                 if ret != 0:
                     raise Exception("Error gunzipping genome {}".format(fname))
-                fname = re.sub(".gz$", "", fname)
+                fname = fname[:-3]
                 bgzip = True
 
             # gmap outputs a folder named genome.name
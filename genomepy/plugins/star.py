@@ -1,5 +1,4 @@
 import os
-import re
 import subprocess as sp
 from shutil import rmtree
 from genomepy.plugin import Plugin
@@ -27,7 +26,7 @@ class StarPlugin(Plugin):
                 ret = sp.check_call(["gunzip", fname])
                 if ret != 0:
                     raise Exception("Error gunzipping genome {}".format(fname))
-                fname = re.sub(".gz$", "", fname)
+                fname = fname[:-3]
                 bgzip = True
 
             # Create index
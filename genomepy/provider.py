@@ -121,6 +121,7 @@ class ProviderBase(object):
         regex=None,
         invert_match=False,
         bgzip=None,
+        threads=1,
         **kwargs
     ):
         """
@@ -149,6 +150,9 @@ class ProviderBase(object):
         bgzip : bool , optional
             If set to True the genome FASTA file will be compressed using bgzip.
             If not specified, the setting from the configuration file will be used.
+
+        threads : int , optional
+            Number of threads used by bgzip. Default is 1.
         """
         genome_dir = os.path.expanduser(genome_dir)
         if not os.path.exists(genome_dir):
@@ -196,18 +200,18 @@ class ProviderBase(object):
                 os.rename(fname, fname + "_to_regex")
                 infa = fname + "_to_regex"
                 outfa = fname
-                filter_fasta(infa, outfa, regex=regex, v=invert_match, force=True)
+                fa = filter_fasta(infa, outfa, regex=regex, v=invert_match, force=True)
 
-                not_included = [
-                    k for k in Fasta(infa).keys() if k not in Fasta(outfa).keys()
-                ]
+                not_included = [k for k in Fasta(infa).keys() if k not in fa.keys()]
 
             # bgzip genome if requested
             if bgzip is None:
                 bgzip = config.get("bgzip", False)
 
             if bgzip:
-                ret = sp.check_call(["bgzip", "-f", fname])
+                # bgzip only supports -@ since htslib 1.4, only use it when needed
+                threads_opt = ["-@", str(threads)] if threads > 1 else []
+                ret = sp.check_call(["bgzip"] + threads_opt + ["-f", fname])
                 if ret != 0:
                     raise Exception(
                         "Error bgzipping {}. ".format(fname) + "Is tabix installed?"
@@ -32,13 +32,13 @@ def filter_fasta(infa, outfa, regex=".*", v=False, force=False):
 
     Parameters
     ----------
-    infa : str
-        Filename of input fasta file.
+    infa : str or Fasta instance
+        Filename of input fasta file, or an already opened pyfaidx Fasta.
 
     outfa : str
         Filename of output fasta file. Cannot be the same as infa.
 
-    regex : str, optional
+    regex : str or compiled regular expression, optional
         Regular expression used for selecting sequences.
 
     v : bool, optional
@@ -52,7 +52,8 @@ def filter_fasta(infa, outfa, regex=".*", v=False, force=False):
         fasta : Fasta instance
             pyfaidx Fasta instance of newly created file
     """
-    if infa == outfa:
+    fa = infa if isinstance(infa, Fasta) else Fasta(infa)
+    if fa.filename == outfa:
         raise ValueError("Input and output FASTA are the same file.")
 
     if os.path.exists(outfa):
@@ -65,13 +66,8 @@ def filter_fasta(infa, outfa, regex=".*", v=False, force=False):
                 "{} already exists, set force to True to overwrite".format(outfa)
             )
 
-    filt_function = re.compile(regex).search
-    fa = Fasta(infa, filt_function=filt_function)
-    seqs = fa.keys()
-    if v:
-        original_fa = Fasta(infa)
-        seqs = [s for s in original_fa.keys() if s not in seqs]
-        fa = original_fa
+    pattern = re.compile(regex)
+    seqs = [s for s in fa.keys() if bool(pattern.search(s)) != bool(v)]
 
     if len(seqs) == 0:
         raise ValueError("No sequences left after filtering!")
@@ -1,4 +1,5 @@
 import genomepy
+import gzip
 import shutil
 import pytest
 import os
@@ -81,3 +82,33 @@ def test_url_genome():
     g = genomepy.Genome("url_test", genome_dir=tmp)
     assert str(g["chrI"][:12]).lower() == "gcctaagcctaa"
     shutil.rmtree(tmp)
+
+
+@pytest.mark.parametrize("threads, bgzip_opts", [(1, ["-f"]), (2, ["-@", "2", "-f"])])
+def test_bgzip_threads(monkeypatch, threads, bgzip_opts):
+    """Only pass -@ to bgzip when using multiple threads."""
+    tmp = mkdtemp()
+    fa = os.path.join(tmp, "threads_test.fa.gz")
+    with gzip.open(fa, "wt") as f:
+        f.write(">chr1\nACGT\n")
+
+    calls = []
+    check_call = genomepy.provider.sp.check_call
+
+    def mock_check_call(cmd, *args, **kwargs):
+        calls.append(cmd)
+        if cmd[0] == "bgzip":
+            # only the command line is tested, compress with gzip
+            with open(cmd[-1], "rb") as f_in, gzip.open(cmd[-1] + ".gz", "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.unlink(cmd[-1])
+            return 0
+        return check_call(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(genomepy.provider.sp, "check_call", mock_check_call)
+    p = genomepy.provider.ProviderBase.create("URL")
+    p.download_genome("file://" + fa, tmp, bgzip=True, threads=threads)
+
+    bgzip_calls = [cmd[1:-1] for cmd in calls if cmd[0] == "bgzip"]
+    assert bgzip_calls == [bgzip_opts]
+    shutil.rmtree(tmp)
@@ -1,41 +1,76 @@
 import genomepy
-import shutil
-import gzip
 import pytest
 import os
-from tempfile import mkdtemp, NamedTemporaryFile
+import re
+from tempfile import NamedTemporaryFile
 from time import sleep
-from platform import system
-
-travis = "TRAVIS" in os.environ and os.environ["TRAVIS"] == "true"
-
-
-@pytest.fixture(scope="module", params=["no-overwrite", "overwrite"])
-def force(request):
-    return request.param
-
-
-@pytest.fixture(scope="module", params=["original_name", "use_localname"])
-def localname(request):
-    return request.param
+from urllib.request import urlretrieve
+from pyfaidx import Fasta
 
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
 
-@pytest.fixture(scope="module", params=["unzipped", "bgzipped"])
-def bgzip(request):
-    return request.param
+travis = "TRAVIS" in os.environ and os.environ["TRAVIS"] == "true"
 
 
+@pytest.fixture(scope="session")
+def ncbi_genome(tmp_path_factory, genome="ASM2732v1"):
+    """Download the NCBI genome once, subsequent installs use the local copy."""
+    tmp = str(tmp_path_factory.mktemp("ncbi"))
+    p = genomepy.provider.ProviderBase.create("NCBI")
+    _, link = p.get_genome_download_link(genome)
+    fname = os.path.join(tmp, os.path.basename(link))
+    urlretrieve(link, fname)
+    return "file://" + fname
+
+
+# pairwise combinations: each pair of options is tested at least once
+@pytest.mark.parametrize(
+    "force, localname, bgzip",
+    [
+        (False, None, False),
+        (False, "My_localname", True),
+        (True, None, True),
+        (True, "My_localname", False),
+    ],
+    ids=[
+        "no-overwrite-original_name-unzipped",
+        "no-overwrite-use_localname-bgzipped",
+        "overwrite-original_name-bgzipped",
+        "overwrite-use_localname-unzipped",
+    ],
+)
 def test_install_genome_options(
-    force, localname, bgzip, genome="ASM2732v1", provider="NCBI"
+    tmp_path,
+    monkeypatch,
+    ncbi_genome,
+    force,
+    localname,
+    bgzip,
+    genome="ASM2732v1",
+    provider="NCBI",
 ):
     """Test force, localname and bgzip"""
-    tmp = mkdtemp()
-    force = False if force == "no-overwrite" else True
-    localname = None if localname == "original_name" else "My_localname"
-    bgzip = False if bgzip == "unzipped" else True
+    # still look up the link, the NCBI post-processing depends on it
+    get_link = genomepy.provider.NCBIProvider.get_genome_download_link
+    monkeypatch.setattr(
+        genomepy.provider.NCBIProvider,
+        "get_genome_download_link",
+        lambda self, name, **kwargs: (get_link(self, name, **kwargs)[0], ncbi_genome),
+    )
+
+    tmp = str(tmp_path)
 
     genomepy.install_genome(
-        genome, provider, genome_dir=tmp, localname=localname, bgzip=bgzip, force=force
+        genome,
+        provider,
+        genome_dir=tmp,
+        localname=localname,
+        bgzip=bgzip,
+        force=force,
+        threads=2,
     )
 
     # force test
@@ -43,53 +78,63 @@ def test_install_genome_options(
     name = genomepy.utils.get_localname(genome, localname)
     path = os.path.join(tmp, name, name + ext)
 
-    t0 = os.path.getmtime(path)
-    # OSX rounds down getmtime to the second
-    if system() != "Linux":
+    t0 = os.stat(path).st_mtime_ns
+    # wait on filesystems with a 1 second mtime resolution (e.g. HFS+)
+    if t0 % 10 ** 9 == 0:
         sleep(1)
     genomepy.install_genome(
-        genome, provider, genome_dir=tmp, localname=localname, bgzip=bgzip, force=force
+        genome,
+        provider,
+        genome_dir=tmp,
+        localname=localname,
+        bgzip=bgzip,
+        force=force,
+        threads=2,
     )
 
-    t1 = os.path.getmtime(path)
+    t1 = os.stat(path).st_mtime_ns
     assert t0 != t1 if force else t0 == t1
 
-    shutil.rmtree(tmp)
+
+def first_record(fname):
+    """Return the fields of the first non-comment line of a gzipped file."""
+    rest = b""
+    with gzip.open(fname, "rb") as f:
+        while True:
+            chunk = f.read(1 << 16)
+            lines = (rest + chunk).split(b"\n")
+            # the last line may be incomplete until the end of the file
+            rest = lines.pop() if chunk else b""
+            for line in lines:
+                if line and not line.startswith(b"#"):
+                    return line.split(b"\t")
+            if not chunk:
+                raise AssertionError("no record found in {}".format(fname))
 
 
 def validate_gzipped_gtf(fname):
     assert os.path.exists(fname)
-    with gzip.open(fname, "r") as f:
-        for line in f:
-            line = line.decode()
-            if line.startswith("#"):
-                continue
-            vals = line.split("\t")
-            assert 9 == len(vals)
-            int(vals[3]), int(vals[4])
-            break
+    vals = first_record(fname)
+    assert 9 == len(vals)
+    int(vals[3]), int(vals[4])
 
 
 def validate_gzipped_bed(fname):
     assert os.path.exists(fname)
-    with gzip.open(fname, "r") as f:
-        for line in f:
-            line = line.decode()
-            if line.startswith("#"):
-                continue
-            vals = line.split("\t")
-            assert 12 == len(vals)
-            int(vals[1]), int(vals[2])
-            break
+    vals = first_record(fname)
+    assert 12 == len(vals)
+    int(vals[1]), int(vals[2])
 
 
+@pytest.mark.parametrize(
+    "localname", [None, "My_localname"], ids=["original_name", "use_localname"]
+)
+@pytest.mark.parametrize("force", [False, True], ids=["no-overwrite", "overwrite"])
 def test_install_annotation_options(
-    force, localname, annotation=True, genome="ASM14646v1", provider="NCBI"
+    tmp_path, force, localname, annotation=True, genome="ASM14646v1", provider="NCBI"
 ):
     """Test force and localname with annotations"""
-    tmp = mkdtemp()
-    force = False if force == "no-overwrite" else True
-    localname = None if localname == "original_name" else "My_localname"
+    tmp = str(tmp_path)
 
     # create dummy fasta to skip download_genome step
     name = genomepy.utils.get_localname(genome, localname)
@@ -113,9 +158,9 @@ def test_install_annotation_options(
     validate_gzipped_bed(bed)
 
     # force test
-    t0 = os.path.getmtime(gtf)
-    # OSX rounds down getmtime to the second
-    if system() != "Linux":
+    t0 = os.stat(gtf).st_mtime_ns
+    # wait on filesystems with a 1 second mtime resolution (e.g. HFS+)
+    if t0 % 10 ** 9 == 0:
         sleep(1)
     genomepy.install_genome(
         genome,
@@ -126,11 +171,9 @@ def test_install_annotation_options(
         force=force,
     )
 
-    t1 = os.path.getmtime(gtf)
+    t1 = os.stat(gtf).st_mtime_ns
     assert t0 != t1 if force else t0 == t1
 
-    shutil.rmtree(tmp)
-
 
 def test_regexp_filter():
     fname = "tests/data/regexp/regexp.fa"
@@ -143,9 +186,17 @@ def test_regexp_filter():
         ("chr.*", 4, 13),
     ]
 
+    # parse the input and compile the regexes only once
+    infa = Fasta(fname)
+    regexps = [(re.compile(regex), m, nm) for regex, m, nm in regexps]
+
     tmpfa = NamedTemporaryFile(suffix=".fa").name
     for regex, match, no_match in regexps:
-        fa = genomepy.utils.filter_fasta(fname, tmpfa, regex=regex, v=False, force=True)
+        fa = genomepy.utils.filter_fasta(infa, tmpfa, regex=regex, v=False, force=True)
         assert len(fa.keys()) == match
-        fa = genomepy.utils.filter_fasta(fname, tmpfa, regex=regex, v=True, force=True)
+        fa = genomepy.utils.filter_fasta(infa, tmpfa, regex=regex, v=True, force=True)
         assert len(fa.keys()) == no_match
+
+    # a filename as input, any falsy v selects the matches
+    fa = genomepy.utils.filter_fasta(fname, tmpfa, regex="Chr.*", v=None, force=True)
+    assert len(fa.keys()) == 2
@@ -1,11 +1,8 @@
 import os
 import pytest
-import re
 from subprocess import check_call
-from tempfile import mkdtemp
-from shutil import rmtree, copyfile
+from shutil import copyfile
 from time import sleep
-from platform import system
 
 from genomepy.plugin import init_plugins, activate
 from genomepy.utils import cmd_ok
@@ -19,171 +16,176 @@ from genomepy.plugins.hisat2 import Hisat2Plugin
 from genomepy.plugins.star import StarPlugin
 from genomepy.plugins.blacklist import BlacklistPlugin
 
+nthreads = str(os.cpu_count() or 4)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def activate_plugins():
+    """Activate all plugins once, they are shared by the whole process."""
+    for p in init_plugins():
+        activate(p)
+
 
 @pytest.fixture(scope="module")
-def tempdir():
+def tempdir(tmp_path_factory):
     """Temporary directory."""
-    tmpdir = mkdtemp()
-    yield tmpdir
-    rmtree(tmpdir)
+    return str(tmp_path_factory.mktemp("plugins"))
 
 
 @pytest.fixture(scope="module", params=["unzipped", "bgzipped"])
 def genome(request, tempdir):
     """Create a test genome."""
     name = "dm3"  # Use fake name for blacklist test
-    fafile = "tests/data/small_genome.fa"
-    bgzipped = True if request.param == "bgzipped" else False
-
-    # Input needs to be bgzipped, depending on param
-    if os.path.exists(fafile + ".gz"):
-        if not bgzipped:
-            check_call(["gunzip", fafile + ".gz"])
-    elif bgzipped:
-        check_call(["bgzip", fafile])
+    fafile = "tests/data/small_genome.fa.gz"
+    genome_dir = os.path.join(tempdir, request.param)
 
-    tmpdir = os.path.join(tempdir, request.param, name)
+    tmpdir = os.path.join(genome_dir, name)
     mkdir_p(tmpdir)
 
-    if bgzipped:
-        fafile += ".gz"
+    # Work on a copy, the (bgzipped) input file is left untouched
+    dst = os.path.join(tmpdir, os.path.basename(fafile))
+    copyfile(fafile, dst)
+    if request.param == "unzipped":
+        check_call(["bgzip", "-@", nthreads, "-d", dst])
 
-    copyfile(fafile, os.path.join(tmpdir, os.path.basename(fafile)))
-    for p in init_plugins():
-        activate(p)
     # provide the fixture value
-    yield Genome(name, genome_dir=os.path.join(tempdir, request.param))
-    if os.path.exists(fafile) and not bgzipped:
-        check_call(["bgzip", fafile])
+    return Genome(name, genome_dir=genome_dir)
 
 
-@pytest.fixture(scope="module", params=["no-overwrite", "overwrite"])
-def force(request):
-    return request.param
+force_params = pytest.mark.parametrize(
+    "force", [False, True], ids=["no-overwrite", "overwrite"]
+)
 
 
 def force_test(p, fname, genome, force):
     """check if a plugin file was properly overwritten (or not) depending on force flag"""
-    t0 = os.path.getmtime(fname)
-    # OSX rounds down getmtime to the second
-    if system() != "Linux":
+    t0 = os.stat(fname).st_mtime_ns
+    # wait on filesystems with a 1 second mtime resolution (e.g. HFS+)
+    if t0 % 10 ** 9 == 0:
         sleep(1)
     p.after_genome_download(genome, force=force)
-    t1 = os.path.getmtime(fname)
+    t1 = os.stat(fname).st_mtime_ns
     assert t0 != t1 if force else t0 == t1
 
 
-def test_blacklist(genome, force):
+def plugin_fixture(plugin_cls):
+    """Fixture providing a plugin with its files created once per genome."""
+
+    @pytest.fixture(scope="module")
+    def plugin(genome):
+        p = plugin_cls()
+        p.after_genome_download(genome)
+        return p
+
+    return plugin
+
+
+blacklist = plugin_fixture(BlacklistPlugin)
+bwa = plugin_fixture(BwaPlugin)
+minimap2 = plugin_fixture(Minimap2Plugin)
+bowtie2 = plugin_fixture(Bowtie2Plugin)
+hisat2 = plugin_fixture(Hisat2Plugin)
+star = plugin_fixture(StarPlugin)
+gmap = plugin_fixture(GmapPlugin)
+
+
+@force_params
+def test_blacklist(blacklist, genome, force):
     """Create blacklist."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    p = BlacklistPlugin()
-
-    p.after_genome_download(genome, force=force)
-    fname = re.sub(".fa(.gz)?$", ".blacklist.bed.gz", genome.filename)
+    ext = ".fa.gz" if genome.filename.endswith(".gz") else ".fa"
+    fname = genome.filename[: -len(ext)] + ".blacklist.bed.gz"
     assert os.path.exists(fname)
 
-    force_test(p, fname, genome, force)
+    force_test(blacklist, fname, genome, force)
 
 
-def test_bwa(genome, force):
+@pytest.mark.skipif(not cmd_ok("bwa"), reason="bwa not installed")
+@force_params
+def test_bwa(bwa, genome, force):
     """Create bwa index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("bwa"):
-        p = BwaPlugin()
-        p.after_genome_download(genome, force=force)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "bwa")
-        fname = os.path.join(index_dir, "{}.fa.sa".format(genome.name))
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "bwa")
+    fname = os.path.join(index_dir, "{}.fa.sa".format(genome.name))
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
 
-        force_test(p, fname, genome, force)
+    force_test(bwa, fname, genome, force)
 
 
-def test_minimap2(genome, force):
+@pytest.mark.skipif(not cmd_ok("minimap2"), reason="minimap2 not installed")
+@force_params
+def test_minimap2(minimap2, genome, force):
     """Create minimap2 index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("minimap2"):
-        p = Minimap2Plugin()
-        p.after_genome_download(genome, force=force)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "minimap2")
-        fname = os.path.join(index_dir, "{}.mmi".format(genome.name))
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "minimap2")
+    fname = os.path.join(index_dir, "{}.mmi".format(genome.name))
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
 
-        force_test(p, fname, genome, force)
+    force_test(minimap2, fname, genome, force)
 
 
-def test_bowtie2(genome, force):
+@pytest.mark.skipif(not cmd_ok("bowtie2"), reason="bowtie2 not installed")
+@force_params
+def test_bowtie2(bowtie2, genome, force):
     """Create bbowtie2 index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("bowtie2"):
-        p = Bowtie2Plugin()
-        p.after_genome_download(genome, force=force)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "bowtie2")
-        fname = os.path.join(index_dir, "{}.1.bt2".format(genome.name))
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "bowtie2")
+    fname = os.path.join(index_dir, "{}.1.bt2".format(genome.name))
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
 
-        force_test(p, fname, genome, force)
+    force_test(bowtie2, fname, genome, force)
 
 
-def test_hisat2(genome, force):
+@pytest.mark.skipif(not cmd_ok("hisat2-build"), reason="hisat2-build not installed")
+@force_params
+def test_hisat2(hisat2, genome, force):
     """Create hisat2 index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("hisat2-build"):
-        p = Hisat2Plugin()
-        p.after_genome_download(genome)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "hisat2")
-        fname = os.path.join(index_dir, "{}.1.ht2".format(genome.name))
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "hisat2")
+    fname = os.path.join(index_dir, "{}.1.ht2".format(genome.name))
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
 
-        force_test(p, fname, genome, force)
+    force_test(hisat2, fname, genome, force)
 
 
-def test_star(genome, force):
+@pytest.mark.skipif(not cmd_ok("STAR"), reason="STAR not installed")
+@force_params
+def test_star(star, genome, force):
     """Create star index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("STAR"):
-        p = StarPlugin()
-        p.after_genome_download(genome)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "star")
-        fname = os.path.join(index_dir, "SA")
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "star")
+    fname = os.path.join(index_dir, "SA")
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
 
-        force_test(p, fname, genome, force)
+    force_test(star, fname, genome, force)
 
 
-def test_gmap(genome, force):
+@pytest.mark.skipif(not cmd_ok("gmap"), reason="gmap not installed")
+@force_params
+def test_gmap(gmap, genome, force):
     """Create gmap index."""
     assert os.path.exists(genome.filename)
 
-    force = True if force == "overwrite" else False
-    if cmd_ok("gmap"):
-        p = GmapPlugin()
-        p.after_genome_download(genome, force=force)
-        dirname = os.path.dirname(genome.filename)
-        index_dir = os.path.join(dirname, "index", "gmap")
-        fname = os.path.join(index_dir, "{}.maps".format(genome.name))
-        assert os.path.exists(index_dir)
-        assert os.path.exists(fname)
-
-        force_test(p, fname, genome, force)
+    dirname = os.path.dirname(genome.filename)
+    index_dir = os.path.join(dirname, "index", "gmap")
+    fname = os.path.join(index_dir, "{}.maps".format(genome.name))
+    assert os.path.exists(index_dir)
+    assert os.path.exists(fname)
+
+    force_test(gmap, fname, genome, force)